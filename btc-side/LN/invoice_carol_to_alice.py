@@ -9,12 +9,22 @@ Stores invoice and secret information in invoice.json
 import json
 import requests
 import base64
-import hashlib
 import subprocess
 import sys
 import argparse
+import functools
+import io
+import logging
+import os
+import urllib3
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to stdlib json
+    orjson = None
+
 # ANSI color codes for terminal output
 RED = '\033[0;31m'
 GREEN = '\033[0;32m'
@@ -24,24 +34,54 @@ CYAN = '\033[0;36m'
 BOLD = '\033[1m'
 NC = '\033[0m'  # No Color
 
+_log = logging.getLogger(__name__)
+
+# Keep-alive REST sessions keyed by tls.cert path ("" = unverified local development)
+_SESSIONS: Dict[str, requests.Session] = {}
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps_pretty(obj: Any) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
 def print_colored(text: str, color: str = NC) -> None:
     """Print colored text to terminal"""
     print(f"{color}{text}{NC}")
 
+def _emit(buf: io.StringIO, text: str = "", color: str = None) -> None:
+    """Append a (colored) line to an output buffer"""
+    if color is None:
+        buf.write(f"{text}\n")
+    else:
+        buf.write(f"{color}{text}{NC}\n")
+
 def print_header(amount_satoshis: int) -> None:
     """Print script header"""
-    print_colored("╔══════════════════════════════════════════════════════════════╗", BLUE)
-    print_colored("║              LIGHTNING INVOICE CREATOR                       ║", BLUE)
-    print_colored(f"║           Carol → Alice ({amount_satoshis} satoshis)                        ║", BLUE)
-    print_colored("╚══════════════════════════════════════════════════════════════╝", BLUE)
-    print()
+    buf = io.StringIO()
+    _emit(buf, "╔══════════════════════════════════════════════════════════════╗", BLUE)
+    _emit(buf, "║              LIGHTNING INVOICE CREATOR                       ║", BLUE)
+    _emit(buf, f"║           Carol → Alice ({amount_satoshis} satoshis)                        ║", BLUE)
+    _emit(buf, "╚══════════════════════════════════════════════════════════════╝", BLUE)
+    _emit(buf)
+    sys.stdout.write(buf.getvalue())
 
-def load_ln_config() -> Dict[str, Any]:
-    """Load Lightning Network configuration from ln.json"""
+def load_ln_config() -> Dict[str, Dict[str, Any]]:
+    """Load Lightning Network configuration from ln.json, indexed by node alias"""
     try:
-        with open('ln.json', 'r') as f:
-            config = json.load(f)
-        return config
+        with open('ln.json', 'rb') as f:
+            config = json_loads(f.read())
+        # Index nodes by alias once so lookups don't rescan the list; the first node with an alias wins
+        nodes_by_alias: Dict[str, Dict[str, Any]] = {}
+        for node in config:
+            nodes_by_alias.setdefault(node.get('alias'), node)
+        return nodes_by_alias
     except FileNotFoundError:
         print_colored("[ERROR] ln.json not found. Run setup_polar_macos.sh first.", RED)
         sys.exit(1)
@@ -49,17 +89,18 @@ def load_ln_config() -> Dict[str, Any]:
         print_colored("[ERROR] Invalid JSON in ln.json", RED)
         sys.exit(1)
 
-def get_carol_config(config: Dict[str, Any]) -> Dict[str, Any]:
+def get_carol_config(config: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     """Extract Carol's node configuration"""
-    for node in config:
-        if node.get('alias') == 'carol':
-            return node
+    node = config.get('carol')
+    if node is not None:
+        return node
     
     print_colored("[ERROR] Carol node not found in ln.json", RED)
     sys.exit(1)
 
-def read_macaroon_hex(macaroon_path: str) -> str:
-    """Read macaroon file and convert to hex"""
+@functools.lru_cache(maxsize=None)
+def read_admin_macaroon_hex(macaroon_path: str) -> str:
+    """Read an admin macaroon file and convert to hex (once per path)"""
     try:
         with open(macaroon_path, 'rb') as f:
             macaroon_bytes = f.read()
@@ -68,26 +109,54 @@ def read_macaroon_hex(macaroon_path: str) -> str:
         print_colored(f"[ERROR] Macaroon file not found: {macaroon_path}", RED)
         sys.exit(1)
 
-def create_invoice(carol_config: Dict[str, Any], amount_satoshis: int) -> Dict[str, Any]:
-    """Create Lightning invoice from Carol"""
-    print_colored(f"🔐 Creating Lightning invoice from Carol for {amount_satoshis} satoshis...", YELLOW)
+def get_session(node_config: Dict[str, Any]) -> requests.Session:
+    """Return the REST session for a node, verifying its tls.cert when ln.json provides one"""
+    tls_cert_path = node_config.get('tls_cert_path', '')
+    session = _SESSIONS.get(tls_cert_path)
+    if session is not None:
+        return session
     
-    # Extract Carol's configuration
-    rest_port = carol_config['rest_port']
+    session = requests.Session()
+    # Otherwise REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE would override session.verify on every request
+    session.trust_env = False
+    if tls_cert_path:
+        # Verifying against the node's own cert keeps TLS on without the insecure-request warning
+        session.verify = tls_cert_path
+    else:
+        # Local Polar nodes use self-signed certificates; silence the warning once
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        session.verify = False  # Skip SSL verification for local development
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    _SESSIONS[tls_cert_path] = session
+    return session
+
+def get_rest_headers(node_config: Dict[str, Any]) -> Dict[str, str]:
+    """Build REST headers with the node's admin macaroon"""
+    alias = node_config.get('alias', 'node')
     admin_macaroon_path = None
     
     # Find admin macaroon
-    for macaroon in carol_config['macaroons']:
+    for macaroon in node_config['macaroons']:
         if macaroon['type'] == 'admin':
             admin_macaroon_path = macaroon['path']
             break
     
     if not admin_macaroon_path:
-        print_colored("[ERROR] Admin macaroon not found for Carol", RED)
+        print_colored(f"[ERROR] Admin macaroon not found for {alias.capitalize()}", RED)
         sys.exit(1)
     
-    # Read macaroon
-    macaroon_hex = read_macaroon_hex(admin_macaroon_path)
+    return {
+        "Grpc-Metadata-macaroon": read_admin_macaroon_hex(admin_macaroon_path),
+        "Content-Type": "application/json"
+    }
+
+def create_invoice(carol_config: Dict[str, Any], amount_satoshis: int) -> Dict[str, Any]:
+    """Create Lightning invoice from Carol"""
+    print_colored(f"🔐 Creating Lightning invoice from Carol for {amount_satoshis} satoshis...", YELLOW)
+    
+    # Extract Carol's configuration
+    rest_port = carol_config['rest_port']
+    headers = get_rest_headers(carol_config)
     
     # Prepare invoice request
     invoice_data = {
@@ -97,29 +166,24 @@ def create_invoice(carol_config: Dict[str, Any], amount_satoshis: int) -> Dict[s
     
     # Create invoice via REST API
     url = f"https://localhost:{rest_port}/v1/invoices"
-    headers = {
-        "Grpc-Metadata-macaroon": macaroon_hex,
-        "Content-Type": "application/json"
-    }
     
     try:
-        response = requests.post(
+        response = get_session(carol_config).post(
             url,
             json=invoice_data,
             headers=headers,
-            verify=False,  # Skip SSL verification for local development
             timeout=10
         )
         response.raise_for_status()
-        invoice_response = response.json()
+        # Parse the raw response body with json_loads (orjson when installed)
+        invoice_response = json_loads(response.content)
         
-        # Debug: Print the response to see the structure
-        print_colored("🔍 Invoice response received:", YELLOW)
-        print(json.dumps(invoice_response, indent=2))
-        print()
+        # Debug: Print the response to see the structure (only with --verbose)
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("Invoice response received:\n%s", json.dumps(invoice_response, indent=2))
         
         return invoice_response
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print_colored(f"[ERROR] Failed to create invoice: {e}", RED)
         sys.exit(1)
 
@@ -132,41 +196,15 @@ def decode_base64_to_hex(base64_string: str) -> str:
         print_colored(f"[ERROR] Failed to decode base64: {e}", RED)
         return ""
 
-def verify_htlc_hash(secret_hex: str, expected_hash_base64: str) -> bool:
-    """Verify HTLC hash by hashing the secret and comparing"""
-    try:
-        # Convert hex secret to bytes
-        secret_bytes = bytes.fromhex(secret_hex)
-        
-        # Hash the secret using SHA256
-        calculated_hash = hashlib.sha256(secret_bytes).digest()
-        calculated_hash_base64 = base64.b64encode(calculated_hash).decode('utf-8')
-        
-        # Compare with expected hash
-        return calculated_hash_base64 == expected_hash_base64
-    except Exception as e:
-        print_colored(f"[ERROR] Failed to verify hash: {e}", RED)
-        return False
-
-def save_invoice_data(invoice_data: Dict[str, Any], secret_hex: str, amount_satoshis: int) -> None:
-    """Save invoice and secret data to invoice.json"""
+def save_invoice_data(invoice_data: Dict[str, Any], amount_satoshis: int) -> None:
+    """Save invoice data to invoice.json"""
+    # The LND response already carries r_hash and payment_request, so they are not
+    # copied again; the preimage only exists after payment (see receipt.json)
     output_data = {
         "invoice": invoice_data,
-        "htlc_secret": {
-            "preimage_base64": invoice_data.get('r_preimage', 'NOT_AVAILABLE_YET'),
-            "preimage_hex": secret_hex,
-            "hash_base64": invoice_data.get('r_hash', ''),
-            "verification": {
-                "hash_verified": "PENDING_PAYMENT",
-                "timestamp": invoice_data.get('creation_date', ''),
-                "expiry": invoice_data.get('expiry', ''),
-                "status": "INVOICE_CREATED_AWAITING_PAYMENT"
-            }
-        },
         "metadata": {
             "amount_satoshis": amount_satoshis,
             "memo": f"Demo invoice from Carol to Alice - {amount_satoshis} satoshis",
-            "payment_request": invoice_data.get('payment_request', ''),
             "created_by": "Carol",
             "created_for": "Alice",
             "invoice_status": "UNPAID"
@@ -174,8 +212,12 @@ def save_invoice_data(invoice_data: Dict[str, Any], secret_hex: str, amount_sato
     }
     
     try:
-        with open('invoice.json', 'w') as f:
-            json.dump(output_data, f, indent=2)
+        # Serialize up front; f.write retries short writes until the whole buffer is on disk
+        buf = json_dumps_pretty(output_data)
+        with open('invoice.json', 'wb') as f:
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
         print_colored("✅ Invoice data saved to invoice.json", GREEN)
     except Exception as e:
         print_colored(f"[ERROR] Failed to save invoice data: {e}", RED)
@@ -183,38 +225,40 @@ def save_invoice_data(invoice_data: Dict[str, Any], secret_hex: str, amount_sato
 
 def print_invoice_summary(invoice_data: Dict[str, Any], secret_hex: str, amount_satoshis: int) -> None:
     """Print summary of created invoice"""
-    print_colored("📋 INVOICE SUMMARY:", BOLD)
-    print_colored("┌─────────────────┬─────────────────────────────────────────────────┐", CYAN)
-    print_colored("│ Field           │ Value                                           │", CYAN)
-    print_colored("├─────────────────┼─────────────────────────────────────────────────┤", CYAN)
-    print_colored(f"│ Amount          │ {amount_satoshis} satoshis                                     │", CYAN)
-    print_colored(f"│ Payment Request │ {invoice_data.get('payment_request', '')[:50]}... │", CYAN)
-    print_colored(f"│ Invoice Hash    │ {invoice_data.get('r_hash', '')[:50]}... │", CYAN)
-    print_colored(f"│ Secret (Hex)    │ {secret_hex[:50]}... │", CYAN)
-    print_colored("└─────────────────┴─────────────────────────────────────────────────┘", CYAN)
-    print()
+    buf = io.StringIO()
+    _emit(buf, "📋 INVOICE SUMMARY:", BOLD)
+    _emit(buf, "┌─────────────────┬─────────────────────────────────────────────────┐", CYAN)
+    _emit(buf, "│ Field           │ Value                                           │", CYAN)
+    _emit(buf, "├─────────────────┼─────────────────────────────────────────────────┤", CYAN)
+    _emit(buf, f"│ Amount          │ {amount_satoshis} satoshis                                     │", CYAN)
+    _emit(buf, f"│ Payment Request │ {invoice_data.get('payment_request', '')[:50]}... │", CYAN)
+    _emit(buf, f"│ Invoice Hash    │ {invoice_data.get('r_hash', '')[:50]}... │", CYAN)
+    _emit(buf, f"│ Secret (Hex)    │ {secret_hex[:50]}... │", CYAN)
+    _emit(buf, "└─────────────────┴─────────────────────────────────────────────────┘", CYAN)
+    _emit(buf)
     
-    print_colored("🔐 HTLC SECRET DETAILS:", BOLD)
-    print_colored("┌─────────────────┬─────────────────────────────────────────────────┐", CYAN)
-    print_colored("│ Field           │ Value                                           │", CYAN)
-    print_colored("├─────────────────┼─────────────────────────────────────────────────┤", CYAN)
-    print_colored(f"│ Secret (Preimage)│ {secret_hex} │", CYAN)
-    print_colored(f"│ Hash (R-Hash)   │ {invoice_data.get('r_hash', '')} │", CYAN)
-    print_colored(f"│ Verification    │ 🔄 PENDING PAYMENT │", CYAN)
-    print_colored("└─────────────────┴─────────────────────────────────────────────────┘", CYAN)
-    print()
+    _emit(buf, "🔐 HTLC SECRET DETAILS:", BOLD)
+    _emit(buf, "┌─────────────────┬─────────────────────────────────────────────────┐", CYAN)
+    _emit(buf, "│ Field           │ Value                                           │", CYAN)
+    _emit(buf, "├─────────────────┼─────────────────────────────────────────────────┤", CYAN)
+    _emit(buf, f"│ Secret (Preimage)│ {secret_hex} │", CYAN)
+    _emit(buf, f"│ Hash (R-Hash)   │ {invoice_data.get('r_hash', '')} │", CYAN)
+    _emit(buf, f"│ Verification    │ 🔄 PENDING PAYMENT │", CYAN)
+    _emit(buf, "└─────────────────┴─────────────────────────────────────────────────┘", CYAN)
+    _emit(buf)
     
-    print_colored("💡 What this means:", YELLOW)
-    print("  • Carol generated a random 32-byte secret (preimage)")
-    print("  • The secret was hashed using SHA256 to create the payment hash")
-    print("  • Only Carol knows the secret until payment is made")
-    print("  • Alice will need this secret to claim the payment")
-    print("  • The invoice is stored in invoice.json")
-    print("  • The secret will be revealed when the invoice is paid")
-    print()
+    _emit(buf, "💡 What this means:", YELLOW)
+    _emit(buf, "  • Carol generated a random 32-byte secret (preimage)")
+    _emit(buf, "  • The secret was hashed using SHA256 to create the payment hash")
+    _emit(buf, "  • Only Carol knows the secret until payment is made")
+    _emit(buf, "  • Alice will need this secret to claim the payment")
+    _emit(buf, "  • The invoice is stored in invoice.json")
+    _emit(buf, "  • The secret will be revealed when the invoice is paid")
+    _emit(buf)
+    sys.stdout.write(buf.getvalue())
 
-def parse_arguments():
-    """Parse command line arguments"""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser"""
     parser = argparse.ArgumentParser(
         description="Create a Lightning Network invoice from Carol to Alice",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -223,6 +267,7 @@ Examples:
   python3 invoice_carol_to_alice.py                    # Create invoice for 13 satoshis (default)
   python3 invoice_carol_to_alice.py --amount 100       # Create invoice for 100 satoshis
   python3 invoice_carol_to_alice.py -a 1000            # Create invoice for 1000 satoshis
+  python3 invoice_carol_to_alice.py --verbose          # Also print the raw LND response
         """
     )
     parser.add_argument(
@@ -231,13 +276,28 @@ Examples:
         default=13,
         help='Amount in satoshis (default: 13)'
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Print the raw invoice response from LND'
+    )
+    return parser
+
+_PARSER = _build_parser()
+
+def parse_arguments():
+    """Parse command line arguments"""
+    return _PARSER.parse_args()
 
 def main():
     """Main function"""
     # Parse command line arguments
     args = parse_arguments()
     amount_satoshis = args.amount
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.verbose:
+        # Only this script goes to DEBUG; urllib3's connection-pool chatter stays hidden
+        _log.setLevel(logging.DEBUG)
     
     print_header(amount_satoshis)
     
@@ -262,7 +322,7 @@ def main():
     secret_hex = "PENDING_PAYMENT"  # Placeholder until payment
     
     # Save invoice data
-    save_invoice_data(invoice_data, secret_hex, amount_satoshis)
+    save_invoice_data(invoice_data, amount_satoshis)
     
     # Print summary
     print_invoice_summary(invoice_data, secret_hex, amount_satoshis)
@@ -4,40 +4,41 @@ Balance checker using ETH/wallet.py and ETH/tokens.py
 Checks balances for specific tokens on Ethereum and Polygon networks
 """
 
-from ETH.wallet import wallet, get_balance
+from ETH.wallet import wallet, batch_balances
 from ETH.tokens import get_address_from_symbol
 import SECRETS
 
-def check_token_balance(wallet_address, token_symbol, network):
-    """Check balance for a specific token on a network"""
-    try:
-        # Get token address from symbol
+def check_network_balances(wallet_address, token_symbols, network):
+    """Check balances for several tokens on a network with one batched RPC request"""
+    token_addresses = {}
+    for token_symbol in token_symbols:
         token_address = get_address_from_symbol(token_symbol, network)
-        
         if token_address == "Unknown":
             print(f"❌ {token_symbol} not found on {network}")
-            return None
-        
-        # Handle native tokens (ETH, MATIC, etc.)
-        if token_address == "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee":
-            # For native tokens, pass None as token_address
-            balance = get_balance(None, network, wallet_address)
         else:
-            # For ERC-20 tokens, pass the token address
-            balance = get_balance(token_address, network, wallet_address)
+            token_addresses[token_symbol] = token_address
+    
+    erc20_addresses = [addr for addr in token_addresses.values() if addr != "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee"]
+    try:
+        balances = batch_balances(wallet_address, erc20_addresses, network)
+    except Exception as e:
+        print(f"❌ Error checking balances on {network}: {e}")
+        return {}
+    
+    results = {}
+    for token_symbol, token_address in token_addresses.items():
+        # Native tokens (ETH, MATIC, etc.) are stored under None
+        is_native = token_address == "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee"
+        balance = balances.get(None if is_native else token_address)
         
         if balance is not None:
-            # Display contract address for ERC-20 tokens, "Native" for native tokens
-            contract_display = token_address if token_address != "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee" else "Native"
+            contract_display = "Native" if is_native else token_address
             print(f"✅ {token_symbol}: {balance:.6f} | Contract: {contract_display}")
-            return balance
         else:
             print(f"❌ Failed to get {token_symbol} balance on {network}")
-            return None
-            
-    except Exception as e:
-        print(f"❌ Error checking {token_symbol} on {network}: {e}")
-        return None
+        results[token_symbol] = balance
+    
+    return results
 
 def main():
     print("🔍 Checking Wallet Balances")
@@ -55,8 +56,7 @@ def main():
     print("-" * 30)
     
     ethereum_tokens = ["USDT", "USDC", "ETH"]
-    for token in ethereum_tokens:
-        check_token_balance(wallet_address, token, "mainnet")
+    check_network_balances(wallet_address, ethereum_tokens, "mainnet")
     
     print()
     
@@ -65,8 +65,7 @@ def main():
     print("-" * 30)
     
     polygon_tokens = ["MATIC", "USDT", "USDC", "BNL"]
-    for token in polygon_tokens:
-        check_token_balance(wallet_address, token, "polygon")
+    check_network_balances(wallet_address, polygon_tokens, "polygon")
     
     print()
     print("=" * 50)
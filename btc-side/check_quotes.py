@@ -1,80 +1,109 @@
-from web3 import Web3
+import io
 import json
-import time
-import random
+import sys
+from itertools import chain
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to stdlib json
+    orjson = None
 
 import SECRETS
-from oinch.get_quote import get_quote
+from oinch.get_quote import get_quote_result
 from ETH.tokens import get_symbol_from_address, get_address_from_symbol
 
+# 1 token with 18 decimals, in wei (what Web3.to_wei(1, 'ether') returns)
+ONE_TOKEN_WEI = 10 ** 18
+
+
+def json_dumps_pretty(obj):
+    """Serialize to indented JSON text, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+
+def _emit(buf, text=""):
+    """Append a line to an output buffer"""
+    buf.write(f"{text}\n")
+
 
 def format_token_amount(amount_wei, decimals):
     """Convert wei amount to human readable format"""
-    amount = int(amount_wei) / (10 ** decimals)
+    # Exact decimal shift; float division drops digits on 18-decimal amounts
+    amount = Decimal(f"{int(amount_wei)}e-{int(decimals)}")
     return f"{amount:,.6f}".rstrip('0').rstrip('.')
 
 
 def print_quote_results(quote, from_token_address, to_token_address, input_amount_wei, pair_name, network):
     """Print quote results in human readable format"""
-    print("=" * 60)
-    print(f"🔄 1INCH SWAP QUOTE RESULTS - {pair_name} ({network.upper()})")
-    print("=" * 60)
+    buf = io.StringIO()
+    _emit(buf, "=" * 60)
+    _emit(buf, f"🔄 1INCH SWAP QUOTE RESULTS - {pair_name} ({network.upper()})")
+    _emit(buf, "=" * 60)
     
     # Input token info
     from_token = quote['fromToken']
     to_token = quote['toToken']
     
-    print(f"\n📤 INPUT:")
-    print(f"   Token: {from_token['name']} ({from_token['symbol']})")
-    print(f"   Address: {from_token['address']}")
-    print(f"   Amount: {format_token_amount(input_amount_wei, from_token['decimals'])} {from_token['symbol']}")
+    _emit(buf, f"\n📤 INPUT:")
+    _emit(buf, f"   Token: {from_token['name']} ({from_token['symbol']})")
+    _emit(buf, f"   Address: {from_token['address']}")
+    _emit(buf, f"   Amount: {format_token_amount(input_amount_wei, from_token['decimals'])} {from_token['symbol']}")
     
-    print(f"\n📥 OUTPUT:")
-    print(f"   Token: {to_token['name']} ({to_token['symbol']})")
-    print(f"   Address: {to_token['address']}")
-    print(f"   Amount: {format_token_amount(quote['toAmount'], to_token['decimals'])} {to_token['symbol']}")
+    _emit(buf, f"\n📥 OUTPUT:")
+    _emit(buf, f"   Token: {to_token['name']} ({to_token['symbol']})")
+    _emit(buf, f"   Address: {to_token['address']}")
+    _emit(buf, f"   Amount: {format_token_amount(quote['toAmount'], to_token['decimals'])} {to_token['symbol']}")
     
     # Calculate exchange rate
     input_amount = int(input_amount_wei) / (10 ** from_token['decimals'])
     output_amount = int(quote['toAmount']) / (10 ** to_token['decimals'])
     exchange_rate = output_amount / input_amount
     
-    print(f"\n💱 EXCHANGE RATE:")
-    print(f"   1 {from_token['symbol']} = {exchange_rate:.6f} {to_token['symbol']}")
+    _emit(buf, f"\n💱 EXCHANGE RATE:")
+    _emit(buf, f"   1 {from_token['symbol']} = {exchange_rate:.6f} {to_token['symbol']}")
     
     # Gas estimate
-    print(f"\n⛽ GAS ESTIMATE:")
-    print(f"   {quote['gas']:,} gas units")
+    _emit(buf, f"\n⛽ GAS ESTIMATE:")
+    _emit(buf, f"   {quote['gas']:,} gas units")
     
     # Route information
-    print(f"\n🛣️  ROUTE:")
+    _emit(buf, f"\n🛣️  ROUTE:")
     protocols = quote['protocols']
+    # Lowercase the endpoint addresses once for the intermediate-token check below
+    from_token_address_lower = from_token['address'].lower()
+    to_token_address_lower = to_token['address'].lower()
     for i, hop in enumerate(protocols):
-        print(f"   Hop {i+1}:")
-        for step in hop:
-            for protocol in step:
-                print(f"     {protocol['name']} ({protocol['part']}%)")
-                # Find token symbols for better readability using token mapping
-                from_symbol = get_symbol_from_address(protocol['fromTokenAddress'], network)
-                to_symbol = get_symbol_from_address(protocol['toTokenAddress'], network)
-                
-                # If symbol is "Unknown", show shortened address
-                if from_symbol == "Unknown":
-                    from_symbol = protocol['fromTokenAddress'][:8] + "..." if len(protocol['fromTokenAddress']) > 10 else protocol['fromTokenAddress']
-                if to_symbol == "Unknown":
-                    to_symbol = protocol['toTokenAddress'][:8] + "..." if len(protocol['toTokenAddress']) > 10 else protocol['toTokenAddress']
-                
-                print(f"     {from_symbol} → {to_symbol}")
-                
-                # Add helpful comment for intermediate tokens
-                if (protocol['fromTokenAddress'].lower() != from_token['address'].lower() and 
-                    protocol['toTokenAddress'].lower() != to_token['address'].lower()):
-                    print(f"     (intermediate token)")
-    
-    print("\n" + "=" * 60)
-
-
-def get_quote_helper(network, symbol_from, symbol_to, amount_wei, api_key, max_retries=5):
+        _emit(buf, f"   Hop {i+1}:")
+        for protocol in chain.from_iterable(hop):
+            _emit(buf, f"     {protocol['name']} ({protocol['part']}%)")
+            step_from_address = protocol['fromTokenAddress']
+            step_to_address = protocol['toTokenAddress']
+            
+            # Find token symbols for better readability using token mapping
+            from_symbol = get_symbol_from_address(step_from_address, network)
+            to_symbol = get_symbol_from_address(step_to_address, network)
+            
+            # If symbol is "Unknown", show shortened address
+            if from_symbol == "Unknown":
+                from_symbol = step_from_address[:8] + "..." if len(step_from_address) > 10 else step_from_address
+            if to_symbol == "Unknown":
+                to_symbol = step_to_address[:8] + "..." if len(step_to_address) > 10 else step_to_address
+            
+            _emit(buf, f"     {from_symbol} → {to_symbol}")
+            
+            # Add helpful comment for intermediate tokens
+            if (step_from_address.lower() != from_token_address_lower and 
+                step_to_address.lower() != to_token_address_lower):
+                _emit(buf, f"     (intermediate token)")
+    
+    _emit(buf, "\n" + "=" * 60)
+    sys.stdout.write(buf.getvalue())
+
+
+def get_quote_helper(network, symbol_from, symbol_to, amount_wei, api_key, max_retries=2):
     """Helper function to get quote using network and symbol parameters"""
     # Get token addresses from symbols
     from_token_address = get_address_from_symbol(symbol_from, network)
@@ -90,27 +119,25 @@ def get_quote_helper(network, symbol_from, symbol_to, amount_wei, api_key, max_r
     
     pair_name = f"{symbol_from} → {symbol_to}"
     
-    # Get quote with retry logic
+    # Get quote, retrying only transient failures. The quote session already backs off
+    # (honouring Retry-After) inside each attempt, so there is no extra sleep here
     for attempt in range(max_retries):
+        print(f"🔍 Attempt {attempt + 1}/{max_retries}: Getting quote for {pair_name} from 1inch Swap API v5.2 ({network.upper()})...")
         try:
-            print(f"🔍 Attempt {attempt + 1}/{max_retries}: Getting quote for {pair_name} from 1inch Swap API v5.2 ({network.upper()})...")
-            quote = get_quote(from_token_address, to_token_address, amount_wei, api_key, network)
-            
-            if quote is not None:
-                print(f"✅ Quote received successfully on attempt {attempt + 1}")
-                return quote, from_token_address, to_token_address, pair_name
-            else:
-                print(f"❌ Attempt {attempt + 1} failed - no quote received")
-                
+            quote, retryable = get_quote_result(from_token_address, to_token_address, amount_wei, api_key, network)
         except Exception as e:
+            # Unexpected errors are not transient, so retrying would only repeat them
             print(f"❌ Attempt {attempt + 1} failed with error: {e}")
+            return None, None, None, None
+        
+        if quote is not None:
+            print(f"✅ Quote received successfully on attempt {attempt + 1}")
+            return quote, from_token_address, to_token_address, pair_name
         
-        # If this wasn't the last attempt, wait before retrying
-        if attempt < max_retries - 1:
-            # Exponential backoff with jitter
-            wait_time = (2 ** attempt) + random.uniform(0, 1)
-            print(f"⏳ Waiting {wait_time:.1f} seconds before retry...")
-            time.sleep(wait_time)
+        if not retryable:
+            print(f"❌ Attempt {attempt + 1} failed with a non-retryable error for {pair_name}")
+            return None, None, None, None
+        print(f"❌ Attempt {attempt + 1} failed - no quote received")
     
     print(f"❌ All {max_retries} attempts failed for {pair_name}")
     return None, None, None, None
@@ -118,8 +145,7 @@ def get_quote_helper(network, symbol_from, symbol_to, amount_wei, api_key, max_r
 
 def check_quote(network, symbol_from, symbol_to):
     """Simple function to get quote for a token pair"""
-    w3 = Web3()
-    amount = w3.to_wei(1, 'ether')  # 1 token
+    amount = ONE_TOKEN_WEI  # 1 token
     
     print(f"\n🚀 Getting quote for {symbol_from} → {symbol_to} on {network.upper()}")
     
@@ -138,7 +164,7 @@ def check_quote(network, symbol_from, symbol_to):
     
     # Also print raw JSON for debugging (optional)
     print(f"\n📄 Raw JSON Response for {pair_name}:")
-    print(json.dumps(quote, indent=2))
+    print(json_dumps_pretty(quote))
     
     return True
 
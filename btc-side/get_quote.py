@@ -1,6 +1,15 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 import os
+import json
+import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to stdlib json
+    orjson = None
 
 # Add the ETH directory to the path so we can import from it
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ETH'))
@@ -10,31 +19,90 @@ from networks import CHAIN_IDS
 # 1inch Swap API v5.2 - Quote endpoint
 # This service provides quotes for token swaps across multiple DEXs
 BASE_API_URL = "https://api.1inch.dev/swap/v5.2"
+QUOTE_URL_TEMPLATE = BASE_API_URL + "/{chain_id}/quote"
 
-def get_quote(from_token_address, to_token_address, amount_wei, the_1inch_api_key, network='polygon'):
-    """
-    Get a quote for swapping tokens using the 1inch Swap API v5.2.
-    
-    This function uses the 1inch Swap API to get a quote for swapping tokens.
-    The API aggregates liquidity from multiple DEXs (like Uniswap, SushiSwap, etc.)
-    and provides the best possible swap route with pricing information.
+# Query flags sent with every quote request
+QUOTE_FLAGS = {
+    'includeTokensInfo': 'true',  # Include detailed token metadata
+    'includeProtocols': 'true',   # Include routing protocol information
+    'includeGas': 'true'          # Include gas estimates
+}
+
+# Authorization headers, built once per API key
+_AUTH_HEADERS = {}
+
+# Longest Retry-After we will sleep for, and the per-request (connect, read) timeout
+MAX_RETRY_AFTER = 10  # seconds
+REQUEST_TIMEOUT = (5, 15)  # seconds
+
+
+class CappedRetry(Retry):
+    """Retry that honours Retry-After but never sleeps longer than MAX_RETRY_AFTER"""
     
-    Args:
-        from_token_address (str): The address of the token to swap from
-        to_token_address (str): The address of the token to swap to
-        amount_wei (int): The am"ount to swap in wei
-        the_1inch_api_key (str): The 1inch API key for authentication
-        network (str): The network to use (default: 'polygon'). Can be a network name or chain ID.
-                      Supported networks: ethereum, polygon, bsc, arbitrum, optimism, etc.
-                      You can also pass a chain ID directly as a string or integer.
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+# Shared session so repeated quotes reuse the TLS connection to api.1inch.dev
+_SESSION = requests.Session()
+_SESSION.headers.update({'Accept': 'application/json'})
+# Retry rate limits and gateway errors inside the session, honouring the server's
+# (capped) Retry-After header on 429 instead of a fixed exponential backoff. TLS and
+# other non-connect errors are not retried: a bad certificate won't fix itself
+_SESSION.mount("https://", HTTPAdapter(max_retries=CappedRetry(
+    total=3,
+    other=0,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True
+)))
+
+def json_loads(data):
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Short-lived on-disk quote cache, so re-running a check within the TTL skips the API call
+QUOTE_CACHE_PATH = os.path.join(os.path.dirname(__file__), '.quote_cache.json')
+QUOTE_CACHE_TTL = 15  # seconds
+
+def _load_quote_cache():
+    """Read the on-disk quote cache, treating a missing, corrupt or malformed file as empty"""
+    try:
+        with open(QUOTE_CACHE_PATH, 'rb') as f:
+            cache = json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    # Keep only well-formed {'timestamp': number, 'quote': ...} entries
+    return {
+        key: entry for key, entry in cache.items()
+        if isinstance(entry, dict) and 'quote' in entry
+        and isinstance(entry.get('timestamp'), (int, float)) and not isinstance(entry['timestamp'], bool)
+    }
+
+def _save_quote_cache(cache):
+    """Write the quote cache back to disk; failures only cost a future cache miss"""
+    try:
+        with open(QUOTE_CACHE_PATH, 'wb') as f:
+            f.write(orjson.dumps(cache) if orjson is not None else json.dumps(cache).encode('utf-8'))
+    except OSError:
+        pass
+
+def get_quote_result(from_token_address, to_token_address, amount_wei, the_1inch_api_key, network='polygon'):
+    """
+    Get a quote like get_quote(), also reporting whether a failure is worth retrying.
     
     Returns:
-        dict: The quote response from the 1inch Swap API, or None if there's an error
-        The response includes:
-        - fromToken/toToken: Token information (symbol, name, decimals, etc.)
-        - toAmount: Expected output amount
-        - protocols: Routing information showing which DEXs will be used
-        - gas: Estimated gas cost for the swap
+        tuple: (quote, retryable). quote is the API response or None on error; retryable is
+        True only for transient failures (connection errors, timeouts, 429 and 5xx responses
+        the session's own retries could not recover from)
     """
     # Determine chain ID
     if isinstance(network, int):
@@ -46,35 +114,89 @@ def get_quote(from_token_address, to_token_address, amount_wei, the_1inch_api_ke
             chain_id = CHAIN_IDS.get(network.lower())
             if chain_id is None:
                 print(f"Error: Unsupported network '{network}'. Supported networks: {', '.join(CHAIN_IDS.keys())}")
-                return None
+                return None, False
     else:
         print(f"Error: Invalid network parameter. Expected string or integer, got {type(network)}")
-        return None
+        return None, False
+    
+    # Serve a recent identical quote from the cache
+    cache_key = f"{chain_id}:{from_token_address.lower()}:{to_token_address.lower()}:{amount_wei}"
+    quote_cache = _load_quote_cache()
+    cached = quote_cache.get(cache_key)
+    if cached is not None and time.time() - cached['timestamp'] < QUOTE_CACHE_TTL:
+        return cached['quote'], False
     
     # Build API URL with chain ID
-    api_url = f"{BASE_API_URL}/{chain_id}/quote"
+    api_url = QUOTE_URL_TEMPLATE.format(chain_id=chain_id)
     
-    headers = {
-        'Authorization': f'Bearer {the_1inch_api_key}',
-        'Accept': 'application/json'
-    }
+    headers = _AUTH_HEADERS.get(the_1inch_api_key)
+    if headers is None:
+        headers = {'Authorization': f'Bearer {the_1inch_api_key}'}
+        _AUTH_HEADERS[the_1inch_api_key] = headers
     
     params = {
         'src': from_token_address,
         'dst': to_token_address,
         'amount': str(amount_wei),
-        'includeTokensInfo': 'true',  # Include detailed token metadata
-        'includeProtocols': 'true',   # Include routing protocol information
-        'includeGas': 'true'          # Include gas estimates
+        **QUOTE_FLAGS
     }
     
     try:
-        response = requests.get(api_url, headers=headers, params=params)
+        response = _SESSION.get(api_url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()
+        quote = json_loads(response.content)
+    except requests.exceptions.HTTPError as e:
+        print(f"Error making request to 1inch Swap API: {e}")
+        # 4xx responses (bad parameters, bad API key) fail the same way every time
+        status = e.response.status_code if e.response is not None else None
+        return None, status is None or status == 429 or status >= 500
+    except requests.exceptions.SSLError as e:
+        # Certificate and handshake failures fail the same way every time (SSLError is a ConnectionError)
+        print(f"Error making request to 1inch Swap API: {e}")
+        return None, False
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.RetryError) as e:
+        # The session has already backed off and retried these; a later attempt may still succeed
+        print(f"Error making request to 1inch Swap API: {e}")
+        return None, True
     except requests.exceptions.RequestException as e:
         print(f"Error making request to 1inch Swap API: {e}")
-        return None
+        return None, False
     except ValueError as e:
         print(f"Error parsing JSON response: {e}")
-        return None
\ No newline at end of file
+        return None, False
+    
+    # Drop expired entries while storing the fresh quote
+    now = time.time()
+    quote_cache = {key: entry for key, entry in quote_cache.items() if now - entry['timestamp'] < QUOTE_CACHE_TTL}
+    quote_cache[cache_key] = {'timestamp': now, 'quote': quote}
+    _save_quote_cache(quote_cache)
+    return quote, False
+
+
+def get_quote(from_token_address, to_token_address, amount_wei, the_1inch_api_key, network='polygon'):
+    """
+    Get a quote for swapping tokens using the 1inch Swap API v5.2.
+    
+    This function uses the 1inch Swap API to get a quote for swapping tokens.
+    The API aggregates liquidity from multiple DEXs (like Uniswap, SushiSwap, etc.)
+    and provides the best possible swap route with pricing information.
+    
+    Args:
+        from_token_address (str): The address of the token to swap from
+        to_token_address (str): The address of the token to swap to
+        amount_wei (int): The am"ount to swap in wei
+        the_1inch_api_key (str): The 1inch API key for authentication
+        network (str): The network to use (default: 'polygon'). Can be a network name or chain ID.
+                      Supported networks: ethereum, polygon, bsc, arbitrum, optimism, etc.
+                      You can also pass a chain ID directly as a string or integer.
+    
+    Returns:
+        dict: The quote response from the 1inch Swap API, or None if there's an error
+        The response includes:
+        - fromToken/toToken: Token information (symbol, name, decimals, etc.)
+        - toAmount: Expected output amount
+        - protocols: Routing information showing which DEXs will be used
+        - gas: Estimated gas cost for the swap
+    """
+    quote, _ = get_quote_result(from_token_address, to_token_address, amount_wei, the_1inch_api_key, network)
+    return quote
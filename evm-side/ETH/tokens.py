@@ -86,11 +86,16 @@ NETWORK_TOKENS = {
     }
 }
 
+# Reverse mappings (lowercase address -> symbol), built once at import
+NETWORK_ADDRESS_TO_SYMBOL = {
+    network: {addr.lower(): symbol for symbol, addr in network_tokens.items()}
+    for network, network_tokens in NETWORK_TOKENS.items()
+}
+
 # Helper function to get symbol from address for a specific network
 def get_symbol_from_address(address, network="polygon"):
     """Get token symbol from address for a specific network (case-insensitive)"""
-    network_tokens = NETWORK_TOKENS.get(network, {})
-    address_to_symbol = {addr.lower(): symbol for symbol, addr in network_tokens.items()}
+    address_to_symbol = NETWORK_ADDRESS_TO_SYMBOL.get(network, {})
     return address_to_symbol.get(address.lower(), "Unknown")
 
 # Helper function to get address from symbol for a specific network
@@ -102,8 +107,7 @@ def get_address_from_symbol(symbol, network="polygon"):
 # Helper function to check if address is known for a specific network
 def is_known_token(address, network="polygon"):
     """Check if token address is in our database for a specific network"""
-    network_tokens = NETWORK_TOKENS.get(network, {})
-    address_to_symbol = {addr.lower(): symbol for symbol, addr in network_tokens.items()}
+    address_to_symbol = NETWORK_ADDRESS_TO_SYMBOL.get(network, {})
     return address.lower() in address_to_symbol
 
 # Helper function to get all known symbols for a specific network
@@ -1,13 +1,57 @@
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 
 import SECRETS
 from ETH.networks import infra_rpc, NETWORK
 
 
+# ERC-20 token ABI for balanceOf and decimals functions
+ERC20_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "type": "function"
+    }
+]
+
+# ERC-20 function selectors for raw eth_call requests
+BALANCE_OF_SELECTOR = "0x70a08231"
+DECIMALS_SELECTOR = "0x313ce567"
+
+# Token decimals never change, so they are read once per (network, token)
+_DECIMALS_CACHE = {}
+
+# Shared HTTP session with a larger keep-alive pool, used by every Web3 provider
+# and by raw JSON-RPC batch requests
+RPC_TIMEOUT = 10  # seconds
+_rpc_session = requests.Session()
+_rpc_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
+@lru_cache(maxsize=None)
+def _balance_of_data_for(wallet_address):
+    """Return the balanceOf(wallet_address) eth_call data, encoded once per wallet"""
+    return BALANCE_OF_SELECTOR + wallet_address.lower().replace("0x", "").rjust(64, "0")
+
+
+@lru_cache(maxsize=None)
 def get_w3_connection(network=NETWORK):
-    """Create and return a Web3 connection for the specified network"""
+    """Create and return a Web3 connection for the specified network (one shared provider per network)"""
     indra_url = infra_rpc(network)
-    return Web3(Web3.HTTPProvider(indra_url))
+    provider = Web3.HTTPProvider(indra_url, session=_rpc_session, request_kwargs={"timeout": RPC_TIMEOUT})
+    return Web3(provider)
 
 
 def wallet(key=SECRETS.WALLET_SEED, network=NETWORK):
@@ -44,34 +88,19 @@ def get_balance(token_address, network=NETWORK, wallet_address=None):
         balance_ether = w3.from_wei(balance_wei, 'ether')
         return float(balance_ether)
     
-    # ERC-20 token ABI for balanceOf and decimals functions
-    abi = [
-        {
-            "constant": True,
-            "inputs": [{"name": "_owner", "type": "address"}],
-            "name": "balanceOf",
-            "outputs": [{"name": "balance", "type": "uint256"}],
-            "type": "function"
-        },
-        {
-            "constant": True,
-            "inputs": [],
-            "name": "decimals",
-            "outputs": [{"name": "", "type": "uint8"}],
-            "type": "function"
-        }
-    ]
-    
     try:
         # Convert address to checksum format
         checksum_address = w3.to_checksum_address(token_address)
         
-        # Create contract instance
-        contract = w3.eth.contract(address=checksum_address, abi=abi)
-        
-        # Get balance and decimals
-        balance = contract.functions.balanceOf(wallet_address).call()
-        decimals = contract.functions.decimals().call()
+        # Get balance with precomputed call data, and decimals only if not cached yet
+        raw_balance = w3.eth.call({"to": checksum_address, "data": _balance_of_data_for(wallet_address)})
+        balance = int.from_bytes(raw_balance, "big")
+        decimals_key = (network, checksum_address)
+        decimals = _DECIMALS_CACHE.get(decimals_key)
+        if decimals is None:
+            contract = w3.eth.contract(address=checksum_address, abi=ERC20_ABI)
+            decimals = contract.functions.decimals().call()
+            _DECIMALS_CACHE[decimals_key] = decimals
         
         # Calculate actual balance
         result = balance / (10 ** decimals)
@@ -80,3 +109,82 @@ def get_balance(token_address, network=NETWORK, wallet_address=None):
     except Exception as e:
         print(f"Error getting ERC-20 balance: {e}")
         return None
+
+
+def _decode_uint(result):
+    """Decode a hex-encoded uint256 JSON-RPC result ("0x" means empty)"""
+    if not result or result == "0x":
+        return None
+    return int(result, 16)
+
+
+def batch_balances(wallet_address, token_addresses, network=NETWORK):
+    """
+    Get native and ERC-20 balances for a wallet in a single JSON-RPC batch request.
+    
+    Args:
+        wallet_address: Wallet address to check balances for
+        token_addresses: List of ERC-20 token contract addresses
+        network: Network name (e.g., 'polygon', 'mainnet')
+    
+    Returns:
+        dict: Maps None to the native token balance and each token address to its
+              balance (None if that lookup failed)
+    """
+    balance_of_data = _balance_of_data_for(wallet_address)
+    
+    # id 0 is the native balance, ids 1..N are balanceOf calls
+    payload = [{"jsonrpc": "2.0", "id": 0, "method": "eth_getBalance", "params": [wallet_address, "latest"]}]
+    for request_id, token_address in enumerate(token_addresses, start=1):
+        payload.append({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "eth_call",
+            "params": [{"to": token_address, "data": balance_of_data}, "latest"]
+        })
+    
+    # Ask for decimals in the same batch for tokens not seen before
+    decimals_ids = {}
+    for token_address in token_addresses:
+        decimals_key = (network, Web3.to_checksum_address(token_address))
+        if decimals_key not in _DECIMALS_CACHE and decimals_key not in decimals_ids.values():
+            request_id = len(payload)
+            decimals_ids[request_id] = decimals_key
+            payload.append({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "eth_call",
+                "params": [{"to": token_address, "data": DECIMALS_SELECTOR}, "latest"]
+            })
+    
+    try:
+        response = _rpc_session.post(infra_rpc(network), json=payload, timeout=RPC_TIMEOUT)
+        response.raise_for_status()
+        body = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error making batch balance request: {e}")
+        return {None: None, **{token_address: None for token_address in token_addresses}}
+    
+    # A batch-level failure comes back as a single error object instead of a list
+    if not isinstance(body, list):
+        error = body.get("error", body) if isinstance(body, dict) else body
+        message = error.get("message", error) if isinstance(error, dict) else error
+        print(f"Error making batch balance request: {message}")
+        return {None: None, **{token_address: None for token_address in token_addresses}}
+    
+    # The server may reorder batch responses, so match them by id
+    results = {item.get("id"): item.get("result") for item in body if isinstance(item, dict)}
+    
+    for request_id, decimals_key in decimals_ids.items():
+        decimals = _decode_uint(results.get(request_id))
+        if decimals is not None:
+            _DECIMALS_CACHE[decimals_key] = decimals
+    
+    balance_wei = _decode_uint(results.get(0))
+    balances = {None: float(Web3.from_wei(balance_wei, 'ether')) if balance_wei is not None else None}
+    for request_id, token_address in enumerate(token_addresses, start=1):
+        raw = _decode_uint(results.get(request_id))
+        decimals = _DECIMALS_CACHE.get((network, Web3.to_checksum_address(token_address)))
+        balances[token_address] = raw / (10 ** decimals) if raw is not None and decimals is not None else None
+    
+    return balances